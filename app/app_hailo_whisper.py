@@ -2,6 +2,9 @@
 
 import time
 import argparse
+import logging
+import logging.handlers
+import multiprocessing
 import os
 import sys
 import queue
@@ -11,14 +14,35 @@ import sounddevice as sd
 from app.hailo_whisper_pipeline import HailoWhisperPipeline
 from common.audio_utils import load_audio, SAMPLE_RATE, pad_or_trim
 from common.preprocessing import preprocess, improve_input_audio
+from common.ring_buffer import SharedAudioRingBuffer
 from common.postprocessing import clean_transcription
 from common.timing_utils import set_timing_display
-from app.whisper_hef_registry import HEF_REGISTRY
+from common import _fast
+from app.whisper_hef_registry import resolve_hef_path
 
 
 # Audio parameters for real-time processing
 DURATION = 5  # chunk duration in seconds
 BLOCK_SIZE = 2048  # Increased block size for better performance
+SILENCE_THRESHOLD = 0.02  # Raw chunks quieter than this skip preprocessing entirely
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging():
+    """
+    Route log records through a queue so the audio callback and worker
+    threads never block on stdio; a background listener does the writes.
+
+    Returns:
+        logging.handlers.QueueListener: Started listener (stop on exit).
+    """
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
+    return listener
 
 
 def get_args():
@@ -82,6 +106,27 @@ def get_args():
     return parser.parse_args()
 
 
+def set_thread_priority(priority, core=None):
+    """
+    Best-effort move of the calling thread to the SCHED_FIFO real-time
+    class, optionally pinning it to one CPU core.
+
+    Needs CAP_SYS_NICE (e.g. run with sudo or grant the capability);
+    silently keeps the default scheduler when not permitted, so the app
+    still runs unprivileged.
+
+    Args:
+        priority (int): SCHED_FIFO priority (1-99, higher preempts lower).
+        core (int, optional): CPU core to pin the thread to.
+    """
+    try:
+        if core is not None and core < (os.cpu_count() or 1):
+            os.sched_setaffinity(0, {core})
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (AttributeError, OSError):
+        pass
+
+
 def get_hef_path(model_variant: str, hw_arch: str, component: str) -> str:
     """
     Method to retrieve HEF path.
@@ -94,16 +139,102 @@ def get_hef_path(model_variant: str, hw_arch: str, component: str) -> str:
     Returns:
         str: Absolute path to the requested HEF file.
     """
-    try:
-        hef_path = HEF_REGISTRY[model_variant][hw_arch][component]
-    except KeyError as e:
-        raise FileNotFoundError(
-            f"HEF not available for model '{model_variant}' on hardware '{hw_arch}'."
-        ) from e
+    return resolve_hef_path(model_variant, hw_arch, component)
+
+
+def mel_worker_process(audio_ring, samples_ready, mel_queue, required_samples, chunk_length, is_nhwc, fast_mode):
+    """
+    Mel-extraction loop, run in its own process.
+
+    Keeping the CPU-heavy preprocessing out of the main process means it
+    never competes with the sounddevice callback for the GIL: audio
+    arrives through the shared-memory ring buffer and finished mels go
+    back over the mel queue.
+
+    Args:
+        audio_ring: SharedAudioRingBuffer fed by the audio callback
+        samples_ready: multiprocessing.Event set when a full chunk is buffered
+        mel_queue: multiprocessing.Queue receiving (mel, audio_peak) tuples
+        required_samples: Samples per chunk
+        chunk_length: Length of audio chunks in seconds
+        is_nhwc: Whether to use NHWC format
+        fast_mode: Whether to use fast mode (reduced accuracy for speed)
+    """
+    # Only the forking thread survives in the child, so the parent's queue
+    # listener is not running here; log straight to stdout instead
+    logger.handlers = [logging.StreamHandler(sys.stdout)]
+
+    # Pin the CPU-heavy mel extraction to one core, at lower priority
+    # than the audio callback, so the two don't preempt each other
+    set_thread_priority(priority=10, core=2)
+    chunks_processed = 0
+    # Reused for every chunk drained from the ring buffer; safe because
+    # the mels are materialized before the next chunk overwrites it
+    chunk_scratch = np.empty(required_samples, dtype=np.float32)
+
+    while True:
+        # Block until the callback signals a full chunk (timeout keeps
+        # the process responsive to termination)
+        if not samples_ready.wait(timeout=0.5):
+            continue
+        samples_ready.clear()
+
+        # Bound end-to-end latency: if inference fell behind (thermal
+        # throttling, a competing model on the NPU), sacrifice the oldest
+        # audio instead of letting the backlog and latency grow unbounded
+        if audio_ring.available > 2 * required_samples:
+            dropped = audio_ring.drop_stale(required_samples)
+            logger.warning("Transcription fell behind; dropped %d samples to catch up", dropped)
 
-    if not os.path.exists(hef_path):
-        raise FileNotFoundError(f"HEF file not found at: {hef_path}\nIf not done yet, please run python3 ./download_resources.py --hw-arch {hw_arch} from the app/ folder to download the required HEF files.")
-    return hef_path
+        audio_chunk = None
+        # Process as soon as we have enough data
+        if audio_ring.available >= required_samples and required_samples > 0:
+            audio_ring.read_into(chunk_scratch)
+            audio_chunk = chunk_scratch
+
+        if audio_chunk is not None and len(audio_chunk) > 0:
+            # Cheap single-pass level check before any mel work: silent
+            # chunks skip preprocessing and inference altogether
+            if _fast.abs_max(audio_chunk) < SILENCE_THRESHOLD:
+                continue
+
+            chunks_processed += 1
+
+            # Process the audio chunk
+            try:
+                # Disable VAD for faster processing in fast mode
+                use_vad = not fast_mode  # Only use VAD in normal mode
+                improved_audio, start_time = improve_input_audio(audio_chunk, vad=use_vad, low_audio_gain=True)
+
+                # Handle case where start_time might be None
+                if start_time is not None:
+                    chunk_offset = start_time - 0.2
+                    if chunk_offset < 0:
+                        chunk_offset = 0
+                else:
+                    chunk_offset = 0
+
+                # The ring buffer already stores float32, so only convert
+                # if something upstream changed the dtype
+                if improved_audio.dtype != np.float32:
+                    improved_audio = np.ascontiguousarray(improved_audio, dtype=np.float32)
+
+                # Preprocess to get mel spectrograms
+                mel_spectrograms = preprocess(
+                    improved_audio,
+                    is_nhwc=is_nhwc,
+                    chunk_length=chunk_length,
+                    chunk_offset=chunk_offset
+                )
+
+                # Audio level travels with the mel so the output path can
+                # flag unclear audio without keeping the chunk alive;
+                # single-pass kernel instead of separate abs and max scans
+                audio_peak = _fast.abs_max(improved_audio)
+                for mel in mel_spectrograms:
+                    mel_queue.put((mel, audio_peak))
+            except Exception as e:
+                logger.error("Error: %s", e)
 
 
 def real_time_stt(whisper_hailo, is_nhwc=True, chunk_length=5, fast_mode=False, stream_output=False, timing=False):
@@ -123,102 +254,86 @@ def real_time_stt(whisper_hailo, is_nhwc=True, chunk_length=5, fast_mode=False,
     print("⏹️  Press Ctrl+C to stop")
     print("-" * 40)
     
-    # Buffer to accumulate audio data
-    audio_buffer = np.array([], dtype=np.float32)
-    buffer_lock = threading.Lock()
-    
+    # Preallocated shared-memory ring buffer between the audio callback
+    # (producer, this process) and the mel worker (consumer, child
+    # process). Sized to hold several chunks so transient inference
+    # slowdowns don't drop audio.
+    required_samples = int(chunk_length * SAMPLE_RATE)
+    audio_ring = SharedAudioRingBuffer(4 * required_samples)
+    # The mel worker relies on fork semantics: the child inherits the
+    # shared ring (whose ndarray view over the shm buffer is unpicklable),
+    # the warmed-up JIT kernels and the logger setup. Pin the start method
+    # instead of trusting the platform default, which varies by Python
+    # version and OS.
+    mp_ctx = multiprocessing.get_context("fork")
+    # Set by the callback once a full chunk is buffered, so the worker
+    # sleeps on the event instead of busy-polling the ring buffer
+    samples_ready = mp_ctx.Event()
+    # The sounddevice callback thread is only reachable from inside the
+    # callback, so elevate it on first invocation
+    callback_primed = False
+
     def audio_callback(indata, frames, time, status):
-        """Callback function for audio input stream."""
+        """Callback function for the raw audio input stream."""
+        nonlocal callback_primed
+        if not callback_primed:
+            set_thread_priority(priority=20)
+            callback_primed = True
         if status:
-            print(f"Audio status: {status}")
-        with buffer_lock:
-            nonlocal audio_buffer
-            # Append new audio data to buffer
-            audio_buffer = np.concatenate([audio_buffer, indata[:, 0]], dtype=np.float32)  # Assuming mono audio
-    
-    def transcription_worker():
-        """Worker thread to process audio chunks and get transcriptions."""
-        chunks_processed = 0
-        
+            # Enqueue the record and return; the listener thread does the I/O
+            logger.warning("Audio status: %s", status)
+        # RawInputStream hands us PortAudio's buffer directly; frombuffer
+        # wraps it as a zero-copy float32 view (mono, so already flat) and
+        # the ring buffer write is the only copy in the callback
+        audio_ring.write(np.frombuffer(indata, dtype=np.float32))
+        if audio_ring.available >= required_samples:
+            samples_ready.set()
+
+    # Bounded hand-off between mel extraction and inference: mel stays at
+    # most two tensors ahead, so CPU preprocessing of chunk N+1 overlaps
+    # with Hailo inference on chunk N without unbounded memory growth
+    mel_queue = mp_ctx.Queue(maxsize=2)
+
+    def infer_worker():
+        """Worker thread to run Hailo inference and print transcriptions."""
         while True:
-            audio_chunk = None
-            with buffer_lock:
-                nonlocal audio_buffer
-                # Check if we have enough audio data for processing
-                required_samples = int(chunk_length * SAMPLE_RATE)
-                # Process as soon as we have enough data
-                if len(audio_buffer) >= required_samples and required_samples > 0:
-                    # Extract a chunk of audio
-                    audio_chunk = audio_buffer[:required_samples].copy()  # Copy only when necessary
-                    # Remove processed audio from buffer
-                    audio_buffer = audio_buffer[required_samples:]
-            
-            if audio_chunk is not None and len(audio_chunk) > 0:
-                chunks_processed += 1
-                
-                # Process the audio chunk
-                try:
-                    # Disable VAD for faster processing in fast mode
-                    use_vad = not fast_mode  # Only use VAD in normal mode
-                    improved_audio, start_time = improve_input_audio(audio_chunk, vad=use_vad, low_audio_gain=True)
-                    
-                    # Handle case where start_time might be None
-                    if start_time is not None:
-                        chunk_offset = start_time - 0.2
-                        if chunk_offset < 0:
-                            chunk_offset = 0
-                    else:
-                        chunk_offset = 0
+            mel, audio_peak = mel_queue.get()
+            try:
+                whisper_hailo.send_data(mel)  # Already float32 from preprocess
+                # get_transcription blocks until the pipeline is done, no
+                # fixed sleep needed
+                raw_transcription = whisper_hailo.get_transcription()
+                transcription = clean_transcription(raw_transcription)
 
-                    # Preprocess to get mel spectrograms with corrected data types
-                    mel_spectrograms = preprocess(
-                        improved_audio.astype(np.float32),  # Ensure float32
-                        is_nhwc=is_nhwc,
-                        chunk_length=chunk_length,
-                        chunk_offset=chunk_offset
-                    )
-
-                    # Send to Whisper pipeline for each mel spectrogram
-                    for mel in mel_spectrograms:
-                        whisper_hailo.send_data(mel.astype(np.float32))  # Ensure float32
-                        time.sleep(0.05)  # Allow processing time
-                        raw_transcription = whisper_hailo.get_transcription()
-                        transcription = clean_transcription(raw_transcription)
-                        
-                        # Output transcriptions cleanly
-                        if transcription.strip() and transcription.strip() != ".":  # Only print meaningful transcriptions
-                            if stream_output:
-                                # Stream the transcription character by character
-                                print("[Transcription] ", end="", flush=True)
-                                for char in transcription:
-                                    print(char, end="", flush=True)
-                                    time.sleep(0.01)  # Very small delay for smooth streaming
-                                print()  # New line after transcription
-                            else:
-                                # Normal output
-                                print(f"[Transcription] {transcription}")
-                        elif transcription.strip() == ".":
-                            # Don't show empty periods
-                            pass
-                        else:
-                            # Only show empty transcriptions if audio level is significant
-                            if np.max(np.abs(improved_audio)) > 0.05:  # Increased threshold to reduce noise
-                                if stream_output:
-                                    print("[Transcription] (unclear)", end="", flush=True)
-                                else:
-                                    print("[Transcription] (unclear audio)")
-                except Exception as e:
-                    print(f"Error: {e}")
-            
-            time.sleep(0.01)  # Small delay to prevent busy waiting
-    
-    # Start transcription worker thread
-    worker_thread = threading.Thread(target=transcription_worker, daemon=True)
-    worker_thread.start()
-    
-    # Start audio input stream
+                # Output transcriptions cleanly
+                if transcription.strip() and transcription.strip() != ".":  # Only print meaningful transcriptions
+                    # One enqueued record; the listener thread writes it out
+                    logger.info("[Transcription] %s", transcription)
+                elif transcription.strip() == ".":
+                    # Don't show empty periods
+                    pass
+                else:
+                    # Only show empty transcriptions if audio level is significant
+                    if audio_peak > 0.05:  # Increased threshold to reduce noise
+                        logger.info("[Transcription] (unclear audio)")
+            except Exception as e:
+                logger.error("Error: %s", e)
+
+    # Mel extraction runs in its own process so it can use a second core
+    # without contending for this process's GIL; inference stays here as a
+    # thread since it owns the Hailo pipeline and mostly waits on the NPU
+    mel_process = mp_ctx.Process(
+        target=mel_worker_process,
+        args=(audio_ring, samples_ready, mel_queue, required_samples, chunk_length, is_nhwc, fast_mode),
+        daemon=True
+    )
+    mel_process.start()
+    infer_thread = threading.Thread(target=infer_worker, daemon=True)
+    infer_thread.start()
+
+    # Start audio input stream (raw variant: no per-callback ndarray wrap)
     try:
-        with sd.InputStream(
+        with sd.RawInputStream(
             samplerate=SAMPLE_RATE,
             blocksize=BLOCK_SIZE,
             channels=1,
@@ -234,6 +349,10 @@ def real_time_stt(whisper_hailo, is_nhwc=True, chunk_length=5, fast_mode=False,
         print("🛑 Stopping...")
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        mel_process.terminate()
+        mel_process.join(timeout=1)
+        audio_ring.close()
 
 
 def main():
@@ -243,6 +362,13 @@ def main():
     # Get command line arguments
     args = get_args()
 
+    # Non-blocking logging for the real-time threads
+    log_listener = setup_logging()
+
+    # Shorter GIL switch interval trims the worst-case wait of the audio
+    # callback behind a long-running worker bytecode stretch
+    sys.setswitchinterval(0.001)
+
     variant = args.variant
     print(f"Selected variant: Whisper {variant}")
     encoder_path = get_hef_path(variant, args.hw_arch, "encoder")
@@ -250,29 +376,39 @@ def main():
 
     # Set timing display
     set_timing_display(args.timing)
+
+    # Pay the one-time JIT compilation cost before any audio arrives
+    _fast.warmup()
     
     whisper_hailo = HailoWhisperPipeline(encoder_path, decoder_path, variant, multi_process_service=args.multi_process_service)
     print("Hailo Whisper pipeline initialized.")
-    
+
+    # Use custom chunk length if specified (real-time mode), otherwise use
+    # model-specific defaults
+    if args.real_time and args.chunk_length is not None:
+        chunk_length = args.chunk_length
+    else:
+        chunk_length = 10 if "tiny" in variant else 5
+
+    # Warm up on one silent chunk so the first real chunk doesn't pay the
+    # one-time costs (FFT/window setup, HEF mapping, first kernel launch)
+    warmup_audio = np.zeros(int(chunk_length * SAMPLE_RATE), dtype=np.float32)
+    for mel in preprocess(warmup_audio, is_nhwc=True, chunk_length=chunk_length):
+        whisper_hailo.send_data(mel)
+        whisper_hailo.get_transcription()
+
     if args.timing:
         print("Timing analysis enabled. Performance metrics will be displayed.")
     
     if args.real_time:
         # Run real-time STT
         is_nhwc = True
-        # Use custom chunk length if specified, otherwise use model defaults
-        if args.chunk_length is not None:
-            chunk_length = args.chunk_length
-        else:
-            # Use model-specific default chunk lengths
-            chunk_length = 10 if "tiny" in variant else 5
         # Use fast mode if specified
         real_time_stt(whisper_hailo, is_nhwc, chunk_length, fast_mode=args.fast_mode, stream_output=args.stream_output, timing=args.timing)
     else:
         # Original batch processing mode
         audio_path = "sampled_audio.wav"
         is_nhwc = True
-        chunk_length = 10 if "tiny" in variant else 5
 
         while True:
             if args.reuse_audio:
@@ -303,9 +439,12 @@ def main():
                 chunk_offset=chunk_offset
             )
 
+            # Enqueue every mel up front so the pipeline keeps the NPU busy,
+            # then collect the results in order; get_transcription blocks
+            # until each one is ready, so no fixed sleep is needed
             for mel in mel_spectrograms:
                 whisper_hailo.send_data(mel)
-                time.sleep(0.1)
+            for _ in mel_spectrograms:
                 transcription = clean_transcription(whisper_hailo.get_transcription())
                 print(f"\n{transcription}")
 
@@ -313,6 +452,7 @@ def main():
                 break  # Exit the loop if reusing audio
 
     whisper_hailo.stop()
+    log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -32,4 +32,37 @@ HEF_REGISTRY = {
                 "decoder": "app/hefs/h10h/tiny.en/tiny_en-whisper-decoder-fixed-sequence.hef",
         }
     }
-}
\ No newline at end of file
+}
+
+# Flat (variant, hw_arch, component) -> (path, exists) lookup resolved once
+# at import, so later calls skip the nested dict walk and filesystem stat
+_RESOLVED = {
+    (variant, hw_arch, component): (path, os.path.exists(path))
+    for variant, archs in HEF_REGISTRY.items()
+    for hw_arch, components in archs.items()
+    for component, path in components.items()
+}
+
+
+def resolve_hef_path(model_variant: str, hw_arch: str, component: str) -> str:
+    """
+    Look up a HEF path from the pre-resolved registry cache.
+
+    Args:
+        model_variant (str): e.g. "tiny", "base"
+        hw_arch (str): e.g. "hailo8", "hailo8l"
+        component (str): "encoder" or "decoder"
+
+    Returns:
+        str: Path to the requested HEF file.
+    """
+    try:
+        hef_path, exists = _RESOLVED[(model_variant, hw_arch, component)]
+    except KeyError:
+        raise FileNotFoundError(
+            f"HEF not available for model '{model_variant}' on hardware '{hw_arch}'."
+        ) from None
+
+    if not exists:
+        raise FileNotFoundError(f"HEF file not found at: {hef_path}\nIf not done yet, please run python3 ./download_resources.py --hw-arch {hw_arch} from the app/ folder to download the required HEF files.")
+    return hef_path
\ No newline at end of file
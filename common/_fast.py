@@ -0,0 +1,74 @@
+"""Fused single-pass audio kernels, JIT-compiled with Numba when available."""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, fastmath=True)
+    def scale_and_scan(audio, gain):
+        """
+        Apply gain to the audio in place and return the absolute peak.
+
+        Fuses the gain multiply and the abs-max scan into a single pass
+        over the chunk instead of three separate full-array traversals.
+
+        Parameters:
+        - audio: 1-D float32 array, modified in place.
+        - gain: Linear gain factor.
+
+        Returns:
+        - The absolute peak of the scaled audio.
+        """
+        peak = 0.0
+        for i in range(audio.shape[0]):
+            value = audio[i] * gain
+            audio[i] = value
+            if value < 0.0:
+                value = -value
+            if value > peak:
+                peak = value
+        return peak
+
+    @njit(cache=True, fastmath=True)
+    def abs_max(audio):
+        """
+        Return the absolute peak of the audio in a single pass.
+
+        Parameters:
+        - audio: 1-D float32 array.
+        """
+        peak = 0.0
+        for i in range(audio.shape[0]):
+            value = audio[i]
+            if value < 0.0:
+                value = -value
+            if value > peak:
+                peak = value
+        return peak
+
+else:
+    # NumPy fallbacks when Numba is not installed. These keep the same
+    # signatures but touch the array more than once.
+
+    def scale_and_scan(audio, gain):
+        """Apply gain to the audio in place and return the absolute peak."""
+        np.multiply(audio, gain, out=audio)
+        return float(np.max(np.abs(audio)))
+
+    def abs_max(audio):
+        """Return the absolute peak of the audio."""
+        return float(np.max(np.abs(audio)))
+
+
+def warmup():
+    """Trigger JIT compilation once at startup so the first real chunk doesn't pay for it."""
+    dummy = np.zeros(16, dtype=np.float32)
+    scale_and_scan(dummy, 1.0)
+    abs_max(dummy)
@@ -94,6 +94,15 @@ def pad_or_trim(array, length: int = N_SAMPLES, *, axis: int = -1):
             return np.pad(array, pad_widths)
 
 
+@lru_cache(maxsize=None)
+def hann_window(device) -> torch.Tensor:
+    """
+    Cache the Hann analysis window per device so repeated spectrogram
+    calls reuse the same tensor instead of reallocating it.
+    """
+    return torch.hann_window(N_FFT).to(device)
+
+
 @lru_cache(maxsize=None)
 def mel_filters(device, n_mels: int) -> torch.Tensor:
     """
@@ -152,7 +161,7 @@ def log_mel_spectrogram(
         audio = audio.to(device)
     if padding > 0:
         audio = F.pad(audio, (0, padding))
-    window = torch.hann_window(N_FFT).to(audio.device)
+    window = hann_window(audio.device)
     stft = torch.stft(audio, N_FFT, HOP_LENGTH, window=window, return_complex=True)
     #print(stft)
 
@@ -6,6 +6,9 @@ import re
 
 excluded_tokens = [11, 13]  # Punctuation tokens to exclude from repetition penalty
 
+# Compiled once at import; clean_transcription runs on every chunk
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.?])\s+')
+
 def apply_repetition_penalty(logits, generated_tokens, penalty=1.5, last_window=8):
     """
     Apply repetition penalty to the logits.
@@ -53,19 +56,18 @@ def temperature_sampling(logits, temperature=0.0):
 
 def clean_transcription(transcription):
     # Split the transcription into sentences using both '.' and '?' as delimiters
-    sentences = re.split(r'(?<=[.?])\s+', transcription)
-    
+    sentences = _SENTENCE_SPLIT_RE.split(transcription)
+
     # Initialize a list to store unique sentences
     unique_sentences = []
-    
+    # Normalized forms of unique_sentences, computed once per sentence
+    normalized_sentences = []
+
     # Iterate through the sentences
     for sentence in sentences:
+        normalized_current = sentence.lower().strip()
         # Check if any part of the current sentence has already appeared in the unique sentences
-        for unique_sentence in unique_sentences:
-            # Normalize both sentences for comparison
-            normalized_current = sentence.lower().strip()
-            normalized_unique = unique_sentence.lower().strip()
-            
+        for normalized_unique in normalized_sentences:
             # Check if the current sentence is a substring of the unique sentence or vice versa
             if normalized_current in normalized_unique or normalized_unique in normalized_current:
                 # If a repetition is found, stop processing and return the cleaned transcription
@@ -78,6 +80,7 @@ def clean_transcription(transcription):
         
         # If no repetition is found, add the current sentence to the unique list
         unique_sentences.append(sentence.strip())
+        normalized_sentences.append(normalized_current)
     
     # If no repetition is found, join all sentences and return
     #cleaned_transcription = '. '.join(unique_sentences)
@@ -5,6 +5,8 @@ import numpy as np
 import logging
 import time
 
+from common._fast import scale_and_scan, abs_max
+
 
 def preprocess(audio, is_nhwc=False, chunk_length = 10, chunk_offset=0, max_duration = 60, overlap=0.0):
     """
@@ -42,8 +44,10 @@ def preprocess(audio, is_nhwc=False, chunk_length = 10, chunk_offset=0, max_dura
         # Ensure the chunk is the right length (this will create a copy only when necessary)
         chunk = common.audio_utils.pad_or_trim(chunk, int(segment_duration * sample_rate))
 
-        # Convert to Mel spectrogram
-        mel = common.audio_utils.log_mel_spectrogram(chunk).to("cpu")
+        # Convert to Mel spectrogram. The encoder HEF input is configured
+        # as FLOAT32, so emit float32 here once instead of re-casting the
+        # mel downstream before every send_data
+        mel = common.audio_utils.log_mel_spectrogram(chunk).to("cpu").numpy().astype(np.float32, copy=False)
         # Run the encoder
 
         # Optimize memory layout
@@ -83,12 +87,12 @@ def improve_input_audio(audio, vad=True, low_audio_gain = True):
     """
     
     # print(f"Max audio level: {np.max(audio)}")
-    if (low_audio_gain == True) and (np.max(audio) < 0.1):
-        if np.max(audio) < 0.1:
-            audio = apply_gain(audio, gain_db=20)  # Increase by 15 dB
-        elif np.max(audio) < 0.2:
-            audio = apply_gain(audio, gain_db=10)  # Increase by 10 dB
-        print(f"New max audio level: {np.max(audio)}")
+    if low_audio_gain == True and abs_max(audio) < 0.1:
+        # Fused kernel: applies the gain in place and scans the new peak
+        # in a single pass instead of separate multiply/abs/max traversals
+        gain_linear = 10 ** (20 / 20)  # Increase by 20 dB
+        new_peak = scale_and_scan(audio, gain_linear)
+        print(f"New max audio level: {new_peak}")
 
     start_time = 0
     if vad:
@@ -0,0 +1,239 @@
+"""Fixed-size single-producer/single-consumer ring buffers for audio samples."""
+
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def next_pow2(n):
+    """
+    Round up to the next power of two.
+
+    Args:
+        n (int): Value to round up.
+
+    Returns:
+        int: Smallest power of two >= n.
+    """
+    return 1 << (int(n) - 1).bit_length()
+
+
+class AudioRingBuffer:
+    """
+    Preallocated float32 ring buffer with one producer and one consumer.
+
+    The audio callback writes blocks with write() while the transcription
+    worker reads fixed-size chunks with read(). The backing array is
+    allocated once, so neither side allocates memory on the hot path.
+    """
+
+    def __init__(self, capacity):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity (int): Minimum number of samples to hold. Rounded up
+                to the next power of two.
+        """
+        self.capacity = next_pow2(capacity)
+        self._buffer = np.empty(self.capacity, dtype=np.float32)
+        # Monotonically increasing sample counters; positions are taken
+        # modulo capacity. Guarded by a lock since Python ints are rebound
+        # rather than mutated in place.
+        self._write_idx = 0
+        self._read_idx = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """Number of samples buffered and not yet consumed."""
+        with self._lock:
+            return self._write_idx - self._read_idx
+
+    def write(self, samples):
+        """
+        Append samples to the buffer (producer side).
+
+        Uses at most two slice copies to handle wrap-around, so the cost is
+        O(len(samples)) regardless of how much audio is already buffered.
+        If the buffer is full, the oldest samples are overwritten.
+
+        Args:
+            samples (np.ndarray): 1-D float32 array of new samples.
+        """
+        n = len(samples)
+        if n == 0:
+            return
+        start = self._write_idx % self.capacity
+        first = min(n, self.capacity - start)
+        np.copyto(self._buffer[start:start + first], samples[:first])
+        if first < n:
+            np.copyto(self._buffer[:n - first], samples[first:])
+        with self._lock:
+            self._write_idx += n
+            # Drop the oldest samples if the consumer fell too far behind
+            if self._write_idx - self._read_idx > self.capacity:
+                self._read_idx = self._write_idx - self.capacity
+
+    def read(self, n):
+        """
+        Consume n samples from the buffer (consumer side).
+
+        Args:
+            n (int): Number of samples to read. Must be <= available.
+
+        Returns:
+            np.ndarray: Contiguous float32 array with the n oldest samples.
+        """
+        start = self._read_idx % self.capacity
+        first = min(n, self.capacity - start)
+        if first < n:
+            chunk = np.concatenate([self._buffer[start:start + first], self._buffer[:n - first]])
+        else:
+            chunk = self._buffer[start:start + first].copy()
+        with self._lock:
+            self._read_idx += n
+        return chunk
+
+    def read_into(self, out):
+        """
+        Consume samples into a caller-provided buffer (consumer side).
+
+        Like read(), but copies straight into a preallocated scratch array
+        with at most two slice assignments, so draining a chunk allocates
+        nothing.
+
+        Args:
+            out (np.ndarray): 1-D float32 destination; its length determines
+                how many samples are consumed. Must be <= available.
+        """
+        n = len(out)
+        start = self._read_idx % self.capacity
+        first = min(n, self.capacity - start)
+        np.copyto(out[:first], self._buffer[start:start + first])
+        if first < n:
+            np.copyto(out[first:], self._buffer[:n - first])
+        with self._lock:
+            self._read_idx += n
+
+    def drop_stale(self, keep):
+        """
+        Discard all but the newest keep samples (consumer side).
+
+        Args:
+            keep (int): Number of most recent samples to retain.
+
+        Returns:
+            int: Number of samples dropped.
+        """
+        with self._lock:
+            dropped = self._write_idx - self._read_idx - keep
+            if dropped > 0:
+                self._read_idx += dropped
+                return dropped
+        return 0
+
+
+class SharedAudioRingBuffer:
+    """
+    AudioRingBuffer variant backed by multiprocessing shared memory.
+
+    The sample storage lives in a SharedMemory block and the read/write
+    counters in multiprocessing.Value ints, so a producer in one process
+    and a consumer in a forked child share audio without pickling it
+    through a queue. Same single-producer/single-consumer contract as
+    AudioRingBuffer.
+    """
+
+    def __init__(self, capacity):
+        """
+        Initialize the shared ring buffer (call in the parent process,
+        before forking the consumer).
+
+        Args:
+            capacity (int): Minimum number of samples to hold. Rounded up
+                to the next power of two.
+        """
+        self.capacity = next_pow2(capacity)
+        self._shm = shared_memory.SharedMemory(create=True, size=self.capacity * 4)
+        self._buffer = np.ndarray((self.capacity,), dtype=np.float32, buffer=self._shm.buf)
+        # One shared lock for both counters: per-Value locks would let
+        # write() (write lock, then read read_idx) and drop_stale() (read
+        # lock, then read write_idx) deadlock against each other across
+        # processes. Holding it during the copies also keeps a wrapping
+        # producer from tearing a chunk mid-read.
+        self._lock = multiprocessing.Lock()
+        self._write_idx = multiprocessing.Value('q', 0, lock=False)
+        self._read_idx = multiprocessing.Value('q', 0, lock=False)
+
+    @property
+    def available(self):
+        """Number of samples buffered and not yet consumed."""
+        with self._lock:
+            return self._write_idx.value - self._read_idx.value
+
+    def write(self, samples):
+        """
+        Append samples to the buffer (producer side).
+
+        Args:
+            samples (np.ndarray): 1-D float32 array of new samples.
+        """
+        n = len(samples)
+        if n == 0:
+            return
+        with self._lock:
+            start = self._write_idx.value % self.capacity
+            first = min(n, self.capacity - start)
+            np.copyto(self._buffer[start:start + first], samples[:first])
+            if first < n:
+                np.copyto(self._buffer[:n - first], samples[first:])
+            self._write_idx.value += n
+            # Drop the oldest samples if the consumer fell too far behind
+            if self._write_idx.value - self._read_idx.value > self.capacity:
+                self._read_idx.value = self._write_idx.value - self.capacity
+
+    def read_into(self, out):
+        """
+        Consume samples into a caller-provided buffer (consumer side).
+
+        Args:
+            out (np.ndarray): 1-D float32 destination; its length determines
+                how many samples are consumed. Must be <= available.
+        """
+        n = len(out)
+        with self._lock:
+            start = self._read_idx.value % self.capacity
+            first = min(n, self.capacity - start)
+            np.copyto(out[:first], self._buffer[start:start + first])
+            if first < n:
+                np.copyto(out[first:], self._buffer[:n - first])
+            self._read_idx.value += n
+
+    def drop_stale(self, keep):
+        """
+        Discard all but the newest keep samples (consumer side).
+
+        Args:
+            keep (int): Number of most recent samples to retain.
+
+        Returns:
+            int: Number of samples dropped.
+        """
+        with self._lock:
+            dropped = self._write_idx.value - self._read_idx.value - keep
+            if dropped > 0:
+                self._read_idx.value += dropped
+                return dropped
+        return 0
+
+    def close(self):
+        """Release the shared-memory block (call from the creating process)."""
+        self._buffer = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
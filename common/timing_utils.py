@@ -16,14 +16,13 @@ def timed_print(message):
         print(message)
 
 def time_function(func):
-    """Decorator to time function execution."""
+    """Decorator to time function execution with a monotonic high-resolution clock."""
     def wrapper(*args, **kwargs):
-        if SHOW_TIMING:
-            start_time = time.time()
-            result = func(*args, **kwargs)
-            end_time = time.time()
-            timed_print(f"[{func.__name__}] {end_time - start_time:.3f}s")
-            return result
-        else:
+        if not SHOW_TIMING:
             return func(*args, **kwargs)
+        start_ns = time.perf_counter_ns()
+        result = func(*args, **kwargs)
+        elapsed_s = (time.perf_counter_ns() - start_ns) * 1e-9
+        timed_print(f"[{func.__name__}] {elapsed_s:.3f}s")
+        return result
     return wrapper
\ No newline at end of file